@@ -5,6 +5,7 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import joblib
+import json
 
 # Page config
 st.set_page_config(
@@ -13,21 +14,127 @@ st.set_page_config(
     layout="wide"
 )
 
+# State abbreviations for the choropleth map
+STATE_ABBREV = {
+    'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
+    'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'Florida': 'FL', 'Georgia': 'GA',
+    'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA',
+    'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD',
+    'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS', 'Missouri': 'MO',
+    'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV', 'New Hampshire': 'NH', 'New Jersey': 'NJ',
+    'New Mexico': 'NM', 'New York': 'NY', 'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH',
+    'Oklahoma': 'OK', 'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC',
+    'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT',
+    'Virginia': 'VA', 'Washington': 'WA', 'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY'
+}
+
 # Load data
 @st.cache_data
 def load_data():
-    results = pd.read_csv('Resources/causal_forest_results.csv')
-    states = pd.read_csv('Resources/state_mapping.csv')
-    importance = pd.read_csv('Resources/feature_importance.csv')
-    summary = joblib.load('Resources/summary_stats.joblib')
+    results = pd.read_parquet('Resources/causal_forest_results.parquet', columns=[
+        'StateFullName',
+        'cate',
+        'cate_lower',
+        'cate_upper',
+        'elasticity',
+        'wage_growth',
+        'inventory_growth',
+        'permits_growth',
+        'mortgage_change',
+        'emp_pop_ratio'
+    ])
+    results['elasticity_quartile'] = pd.qcut(
+        results['elasticity'], q=4,
+        labels=['Q1 (Constrained)', 'Q2', 'Q3', 'Q4 (Elastic)']
+    )
+    states = pd.read_parquet('Resources/state_mapping.parquet')
+    importance = pd.read_parquet('Resources/feature_importance.parquet')
+    with open('Resources/summary_stats.json') as f:
+        summary = json.load(f)
     return results, states, importance, summary
 
 @st.cache_resource
 def load_model():
-    return joblib.load('Model/causal_forest_model.joblib')
+    model = joblib.load('Model/causal_forest_model.joblib')
+    # Predict with every core regardless of the n_jobs the forest was saved with
+    for forest in getattr(model.model_final_, 'estimators_', []):
+        forest.n_jobs = -1
+    return model
+
+# Aggregates used across tabs, computed once per dataset
+@st.cache_data
+def build_aggregates():
+    results = load_data()[0]
+    
+    state_avg = results.groupby('StateFullName', sort=False, observed=True).agg({
+        'cate': 'mean',
+        'cate_lower': 'mean',
+        'cate_upper': 'mean',
+        'elasticity': 'mean'
+    }).reset_index().sort_values('cate', ascending=False)
+    state_avg['StateAbbrev'] = state_avg['StateFullName'].map(STATE_ABBREV)
+    
+    state_avg_sim = results.groupby('StateFullName', observed=True).agg({
+        'elasticity': 'mean',
+        'wage_growth': 'mean',
+        'inventory_growth': 'mean',
+        'permits_growth': 'mean',
+        'mortgage_change': 'mean',
+        'emp_pop_ratio': 'mean'
+    }).reset_index()
+    
+    quartile_stats = results.groupby('elasticity_quartile', observed=False)['cate'].agg(['mean', 'std']).reset_index()
+    
+    # Ascending so the horizontal bar draws the largest effect on top with no re-sort
+    top15 = state_avg.nlargest(15, 'cate').iloc[::-1]
+    
+    state_avg_by_name = state_avg.set_index('StateFullName')
+    state_sim_by_name = state_avg_sim.set_index('StateFullName')
+    
+    return state_avg, state_avg_sim, quartile_stats, state_avg_by_name, state_sim_by_name, top15
+
+# Column ranges for slider bounds and the gauge axis
+@st.cache_data
+def col_bounds():
+    results = load_data()[0]
+    return {
+        c: (float(results[c].min()), float(results[c].max()))
+        for c in ['elasticity', 'wage_growth', 'inventory_growth', 'permits_growth',
+                  'mortgage_change', 'emp_pop_ratio', 'cate']
+    }
+
+# Cached predictions, keyed on the slider values
+def feature_key(*values, ndigits=6):
+    # Slider steps are discrete; rounding folds float noise like 0.30000000000000004 into one key
+    return tuple(round(float(v), ndigits) for v in values)
+
+@st.cache_data(max_entries=4096)
+def predict_cate(params):
+    X = np.empty((1, 6))
+    X[0] = params
+    return float(load_model().effect(X)[0])
+
+# Interval needs a variance pass over the forest, so it is only computed on request
+@st.cache_data(max_entries=4096)
+def predict_interval(params):
+    X = np.empty((1, 6))
+    X[0] = params
+    lower, upper = load_model().effect_interval(X, alpha=0.05)
+    return float(lower[0]), float(upper[0])
+
+@st.cache_data(max_entries=4096)
+def sweep_effects(wage, inventory, permits, mortgage, emp, lo, hi, n=50):
+    elasticity_range = np.linspace(lo, hi, n)
+    X_sweep = np.empty((n, 6))
+    X_sweep[:, 0] = elasticity_range
+    X_sweep[:, 1:] = (wage, inventory, permits, mortgage, emp)
+    return elasticity_range, load_model().effect(X_sweep).astype(np.float32)
 
 results_df, state_mapping, importance_df, summary_stats = load_data()
 cf_model = load_model()
+(state_avg, state_avg_sim, quartile_stats,
+ state_avg_by_name, state_sim_by_name, top15) = build_aggregates()
+bounds = col_bounds()
 
 # Header
 st.title("🏠 Rent → Home Price Transmission")
@@ -39,42 +146,59 @@ tab1, tab2, tab3 = st.tabs(["📊 State Explorer", "🔬 Effect Simulator", "
 # =============================================================================
 # TAB 1: State Explorer
 # =============================================================================
-with tab1:
+@st.cache_data
+def make_state_map():
+    fig_map = px.choropleth(
+        state_avg,
+        locations='StateAbbrev',
+        locationmode='USA-states',
+        color='cate',
+        color_continuous_scale='RdYlBu_r',
+        scope='usa',
+        labels={'cate': 'CATE', 'StateAbbrev': 'State'},
+        hover_name='StateFullName',
+        hover_data={'cate': ':.4f', 'elasticity': ':.2f', 'StateAbbrev': False}
+    )
+    fig_map.update_layout(
+        geo=dict(bgcolor='rgba(0,0,0,0)', lakecolor='lightblue'),
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=0, r=0, t=0, b=0)
+    )
+    return fig_map.to_dict()
+
+@st.cache_data
+def make_top_states_bar():
+    fig_bar = px.bar(
+        top15,
+        x='cate',
+        y='StateFullName',
+        orientation='h',
+        color='cate',
+        color_continuous_scale='RdYlBu_r',
+        labels={'cate': 'Treatment Effect', 'StateFullName': 'State'}
+    )
+    fig_bar.update_layout(
+        title='Top 15 States by Treatment Effect',
+        yaxis={'categoryorder': 'array', 'categoryarray': top15['StateFullName'].tolist()},
+        showlegend=False,
+        height=400
+    )
+    return fig_bar.to_dict()
+
+@st.fragment
+def render_state_explorer():
     col1, col2 = st.columns([1, 2])
     
     with col1:
         st.subheader("Select State")
         
-        # State selector - aggregate by state
-        state_avg = results_df.groupby('StateFullName').agg({
-            'cate': 'mean',
-            'cate_lower': 'mean',
-            'cate_upper': 'mean',
-            'elasticity': 'mean'
-        }).reset_index().sort_values('cate', ascending=False)
-        
-        # Add state abbreviations for map
-        state_abbrev_map = {
-            'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
-            'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'Florida': 'FL', 'Georgia': 'GA',
-            'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA',
-            'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD',
-            'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS', 'Missouri': 'MO',
-            'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV', 'New Hampshire': 'NH', 'New Jersey': 'NJ',
-            'New Mexico': 'NM', 'New York': 'NY', 'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH',
-            'Oklahoma': 'OK', 'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC',
-            'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT',
-            'Virginia': 'VA', 'Washington': 'WA', 'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY'
-        }
-        state_avg['StateAbbrev'] = state_avg['StateFullName'].map(state_abbrev_map)
-        
         selected_state = st.selectbox(
             "Choose a state:",
             state_avg['StateFullName'].tolist()
         )
         
         # State stats
-        state_data = state_avg[state_avg['StateFullName'] == selected_state].iloc[0]
+        state_data = state_avg_by_name.loc[selected_state].to_dict()
         
         st.metric(
             label="Average Treatment Effect",
@@ -102,46 +226,93 @@ with tab1:
         st.subheader("State-Level Treatment Effects")
         
         # Choropleth map
-        fig_map = px.choropleth(
-            state_avg,
-            locations='StateAbbrev',
-            locationmode='USA-states',
-            color='cate',
-            color_continuous_scale='RdYlBu_r',
-            scope='usa',
-            labels={'cate': 'CATE', 'StateAbbrev': 'State'},
-            hover_name='StateFullName',
-            hover_data={'cate': ':.4f', 'elasticity': ':.2f', 'StateAbbrev': False}
-        )
-        fig_map.update_layout(
-            geo=dict(bgcolor='rgba(0,0,0,0)', lakecolor='lightblue'),
-            paper_bgcolor='rgba(0,0,0,0)',
-            margin=dict(l=0, r=0, t=0, b=0)
-        )
-        st.plotly_chart(fig_map, use_container_width=True)
+        st.plotly_chart(make_state_map(), use_container_width=True)
 
         # Bar chart
-        fig_bar = px.bar(
-            state_avg.head(15),
-            x='cate',
-            y='StateFullName',
-            orientation='h',
-            color='cate',
-            color_continuous_scale='RdYlBu_r',
-            labels={'cate': 'Treatment Effect', 'StateFullName': 'State'}
-        )
-        fig_bar.update_layout(
-            title='Top 15 States by Treatment Effect',
-            yaxis={'categoryorder': 'total ascending'},
-            showlegend=False,
-            height=400
-        )
-        st.plotly_chart(fig_bar, use_container_width=True)
+        st.plotly_chart(make_top_states_bar(), use_container_width=True)
+
+with tab1:
+    render_state_explorer()
 
 # =============================================================================
 # TAB 2: Effect Simulator
 # =============================================================================
-with tab2:
+@st.cache_data(max_entries=128)
+def make_gauge(sim_effect, sim_state):
+    fig_gauge = go.Figure(go.Indicator(
+        mode="gauge+number+delta",
+        value=sim_effect,
+        delta={'reference': summary_stats['ate'], 'relative': False},
+        gauge={
+            'axis': {'range': list(bounds['cate'])},
+            'bar': {'color': "#3b82f6"},
+            'steps': [
+                {'range': [bounds['cate'][0], summary_stats['ate']], 'color': "#22c55e"},
+                {'range': [summary_stats['ate'], bounds['cate'][1]], 'color': "#ef4444"}
+            ],
+            'threshold': {
+                'line': {'color': "black", 'width': 4},
+                'thickness': 0.75,
+                'value': summary_stats['ate']
+            }
+        },
+        title={'text': f"Simulated CATE for {sim_state} vs National Average"}
+    ))
+    fig_gauge.update_layout(height=300)
+    return fig_gauge.to_dict()
+
+@st.cache_data(max_entries=128)
+def make_sweep_line(sim_elasticity, sim_wage, sim_inventory, sim_permits, sim_mortgage, sim_emp, sim_state):
+    elasticity_range, effects_range = sweep_effects(
+        sim_wage, sim_inventory, sim_permits, sim_mortgage, sim_emp,
+        bounds['elasticity'][0],
+        bounds['elasticity'][1]
+    )
+    
+    fig_line = go.Figure(go.Scattergl(
+        x=elasticity_range,
+        y=effects_range,
+        mode='lines'
+    ))
+    fig_line.add_vline(x=sim_elasticity, line_dash="dash", line_color="red",
+                      annotation_text=f"{sim_state}")
+    fig_line.update_layout(
+        title="How Elasticity Affects Treatment Effect (Other Conditions Held Constant)",
+        xaxis_title='Housing Supply Elasticity',
+        yaxis_title='Treatment Effect'
+    )
+    return fig_line.to_dict()
+
+@st.cache_data(max_entries=128)
+def make_comparison(counterfactual_value, causal_price_effect_dollar, sim_state):
+    fig_comparison = go.Figure()
+    fig_comparison.add_trace(go.Bar(
+        name='Counterfactual (No Rent Change)',
+        x=['Home Value'],
+        y=[counterfactual_value],
+        marker_color='#3b82f6',
+        text=[f'${counterfactual_value:,.0f}'],
+        textposition='inside'
+    ))
+    fig_comparison.add_trace(go.Bar(
+        name='Causal Effect of Rent',
+        x=['Home Value'],
+        y=[causal_price_effect_dollar],
+        marker_color='#ef4444' if causal_price_effect_dollar > 0 else '#22c55e',
+        text=[f'+${causal_price_effect_dollar:,.0f}' if causal_price_effect_dollar > 0 else f'${causal_price_effect_dollar:,.0f}'],
+        textposition='inside'
+    ))
+    fig_comparison.update_layout(
+        barmode='stack',
+        title=f'Home Value Decomposition in {sim_state}',
+        yaxis_title='Value ($)',
+        showlegend=True,
+        height=350
+    )
+    return fig_comparison.to_dict()
+
+@st.fragment
+def render_effect_simulator():
     st.subheader("Simulate Treatment Effects Under Different Conditions")
     st.markdown("Adjust market conditions to see how they affect the rent→price transmission.")
     
@@ -151,15 +322,6 @@ with tab2:
         st.markdown("### Market Conditions")
         
         # State selector for simulator
-        state_avg_sim = results_df.groupby('StateFullName').agg({
-            'elasticity': 'mean',
-            'wage_growth': 'mean',
-            'inventory_growth': 'mean',
-            'permits_growth': 'mean',
-            'mortgage_change': 'mean',
-            'emp_pop_ratio': 'mean'
-        }).reset_index()
-        
         sim_state = st.selectbox(
             "Select State",
             state_avg_sim['StateFullName'].tolist(),
@@ -167,7 +329,7 @@ with tab2:
         )
         
         # Get state defaults
-        state_defaults = state_avg_sim[state_avg_sim['StateFullName'] == sim_state].iloc[0]
+        state_defaults = state_sim_by_name.loc[sim_state].to_dict()
         
         st.markdown("---")
         
@@ -176,8 +338,8 @@ with tab2:
         st.caption("Measures how responsive housing supply is to price changes. Lower values indicate constrained markets (e.g., San Francisco) where new construction is difficult.")
         sim_elasticity = st.slider(
             "Elasticity Value",
-            min_value=float(results_df['elasticity'].min()),
-            max_value=float(results_df['elasticity'].max()),
+            min_value=bounds['elasticity'][0],
+            max_value=bounds['elasticity'][1],
             value=float(state_defaults['elasticity']),
             step=0.1,
             label_visibility="collapsed"
@@ -190,8 +352,8 @@ with tab2:
         st.caption("Year-over-year percentage change in average wages.")
         sim_wage = st.slider(
             "Wage Growth (%)",
-            min_value=float(results_df['wage_growth'].min()),
-            max_value=float(results_df['wage_growth'].max()),
+            min_value=bounds['wage_growth'][0],
+            max_value=bounds['wage_growth'][1],
             value=float(state_defaults['wage_growth']),
             step=0.5,
             label_visibility="collapsed"
@@ -204,8 +366,8 @@ with tab2:
         st.caption("Change in the number of homes available for sale.")
         sim_inventory = st.slider(
             "Inventory Growth (%)",
-            min_value=float(results_df['inventory_growth'].min()),
-            max_value=float(results_df['inventory_growth'].max()),
+            min_value=bounds['inventory_growth'][0],
+            max_value=bounds['inventory_growth'][1],
             value=float(state_defaults['inventory_growth']),
             step=1.0,
             label_visibility="collapsed"
@@ -218,8 +380,8 @@ with tab2:
         st.caption("Year-over-year change in new residential building permits issued.")
         sim_permits = st.slider(
             "Permits Growth (%)",
-            min_value=float(results_df['permits_growth'].min()),
-            max_value=float(results_df['permits_growth'].max()),
+            min_value=bounds['permits_growth'][0],
+            max_value=bounds['permits_growth'][1],
             value=float(state_defaults['permits_growth']),
             step=1.0,
             label_visibility="collapsed"
@@ -232,8 +394,8 @@ with tab2:
         st.caption("Change in average 30-year fixed mortgage rates in percentage points.")
         sim_mortgage = st.slider(
             "Mortgage Change (pp)",
-            min_value=float(results_df['mortgage_change'].min()),
-            max_value=float(results_df['mortgage_change'].max()),
+            min_value=bounds['mortgage_change'][0],
+            max_value=bounds['mortgage_change'][1],
             value=float(state_defaults['mortgage_change']),
             step=0.1,
             label_visibility="collapsed"
@@ -246,35 +408,35 @@ with tab2:
         st.caption("Change in the percentage of working-age population that is employed.")
         sim_emp = st.slider(
             "Emp-Pop Ratio Change",
-            min_value=float(results_df['emp_pop_ratio'].min()),
-            max_value=float(results_df['emp_pop_ratio'].max()),
+            min_value=bounds['emp_pop_ratio'][0],
+            max_value=bounds['emp_pop_ratio'][1],
             value=float(state_defaults['emp_pop_ratio']),
             step=0.1,
             label_visibility="collapsed"
         )
     
     with col2:
-        # Create input for prediction (6 features, no state_code)
-        X_sim = np.array([[
+        # Predict effect (6 features, no state_code)
+        sim_params = feature_key(
             sim_elasticity,
             sim_wage,
             sim_inventory,
             sim_permits,
             sim_mortgage,
             sim_emp
-        ]])
-        
-        # Predict effect
-        sim_effect = cf_model.effect(X_sim)[0]
-        sim_lower, sim_upper = cf_model.effect_interval(X_sim, alpha=0.05)
+        )
+        sim_effect = predict_cate(sim_params)
         
         st.markdown(f"### Predicted Treatment Effect for {sim_state}")
+        show_ci = st.toggle("Show 95% CI", value=False)
         
         # Display result
         col_a, col_b, col_c = st.columns(3)
         col_a.metric("CATE", f"{sim_effect:.4f}")
-        col_b.metric("95% CI Lower", f"{sim_lower[0]:.4f}")
-        col_c.metric("95% CI Upper", f"{sim_upper[0]:.4f}")
+        if show_ci:
+            sim_lower, sim_upper = predict_interval(sim_params)
+            col_b.metric("95% CI Lower", f"{sim_lower:.4f}")
+            col_c.metric("95% CI Upper", f"{sim_upper:.4f}")
         
         # Interpretation
         st.markdown("---")
@@ -296,50 +458,14 @@ with tab2:
         """)
         
         # Comparison gauge
-        fig_gauge = go.Figure(go.Indicator(
-            mode="gauge+number+delta",
-            value=sim_effect,
-            delta={'reference': summary_stats['ate'], 'relative': False},
-            gauge={
-                'axis': {'range': [results_df['cate'].min(), results_df['cate'].max()]},
-                'bar': {'color': "#3b82f6"},
-                'steps': [
-                    {'range': [results_df['cate'].min(), summary_stats['ate']], 'color': "#22c55e"},
-                    {'range': [summary_stats['ate'], results_df['cate'].max()], 'color': "#ef4444"}
-                ],
-                'threshold': {
-                    'line': {'color': "black", 'width': 4},
-                    'thickness': 0.75,
-                    'value': summary_stats['ate']
-                }
-            },
-            title={'text': f"Simulated CATE for {sim_state} vs National Average"}
-        ))
-        fig_gauge.update_layout(height=300)
-        st.plotly_chart(fig_gauge, use_container_width=True)
+        st.plotly_chart(make_gauge(sim_effect, sim_state), use_container_width=True)
         
         # Elasticity effect visualization
         st.markdown("### Effect Across Elasticity Spectrum")
-        elasticity_range = np.linspace(
-            results_df['elasticity'].min(),
-            results_df['elasticity'].max(),
-            50
-        )
-        
-        effects_range = []
-        for e in elasticity_range:
-            X_temp = np.array([[e, sim_wage, sim_inventory, sim_permits, sim_mortgage, sim_emp]])
-            effects_range.append(cf_model.effect(X_temp)[0])
-        
-        fig_line = px.line(
-            x=elasticity_range,
-            y=effects_range,
-            labels={'x': 'Housing Supply Elasticity', 'y': 'Treatment Effect'}
+        st.plotly_chart(
+            make_sweep_line(*sim_params, sim_state),
+            use_container_width=True
         )
-        fig_line.add_vline(x=sim_elasticity, line_dash="dash", line_color="red",
-                          annotation_text=f"{sim_state}")
-        fig_line.update_layout(title="How Elasticity Affects Treatment Effect (Other Conditions Held Constant)")
-        st.plotly_chart(fig_line, use_container_width=True)
 
     st.markdown("---")
     st.markdown("### 💰 Real-World Impact Calculator")
@@ -390,31 +516,10 @@ with tab2:
         )
 
     # Visual comparison
-    fig_comparison = go.Figure()
-    fig_comparison.add_trace(go.Bar(
-        name='Counterfactual (No Rent Change)',
-        x=['Home Value'],
-        y=[counterfactual_value],
-        marker_color='#3b82f6',
-        text=[f'${counterfactual_value:,.0f}'],
-        textposition='inside'
-    ))
-    fig_comparison.add_trace(go.Bar(
-        name='Causal Effect of Rent',
-        x=['Home Value'],
-        y=[causal_price_effect_dollar],
-        marker_color='#ef4444' if causal_price_effect_dollar > 0 else '#22c55e',
-        text=[f'+${causal_price_effect_dollar:,.0f}' if causal_price_effect_dollar > 0 else f'${causal_price_effect_dollar:,.0f}'],
-        textposition='inside'
-    ))
-    fig_comparison.update_layout(
-        barmode='stack',
-        title=f'Home Value Decomposition in {sim_state}',
-        yaxis_title='Value ($)',
-        showlegend=True,
-        height=350
+    st.plotly_chart(
+        make_comparison(counterfactual_value, causal_price_effect_dollar, sim_state),
+        use_container_width=True
     )
-    st.plotly_chart(fig_comparison, use_container_width=True)
 
     with st.expander("⚠️ Important Caveats"):
         st.markdown("""
@@ -424,10 +529,52 @@ with tab2:
         - The 12-month lag means this effect materializes over the following year.
         """)
 
+with tab2:
+    render_effect_simulator()
+
 # =============================================================================
 # TAB 3: Summary
 # =============================================================================
-with tab3:
+@st.cache_data
+def make_cate_histogram():
+    fig_hist = go.Figure(go.Histogram(x=results_df['cate'].to_numpy(), nbinsx=30))
+    fig_hist.update_layout(
+        title='Distribution of Treatment Effects',
+        xaxis_title='Treatment Effect',
+        yaxis_title='count'
+    )
+    fig_hist.add_vline(x=summary_stats['ate'], line_dash="dash", line_color="red",
+                      annotation_text=f"Mean: {summary_stats['ate']:.4f}")
+    return fig_hist.to_dict()
+
+@st.cache_data
+def make_importance_bar():
+    fig_importance = px.bar(
+        importance_df.sort_values('importance'),
+        x='importance',
+        y='feature',
+        orientation='h',
+        labels={'importance': 'Importance', 'feature': 'Feature'},
+        title='What Drives Treatment Effect Heterogeneity?'
+    )
+    return fig_importance.to_dict()
+
+@st.cache_data
+def make_quartile_bar():
+    fig_quartile = px.bar(
+        quartile_stats,
+        x='elasticity_quartile',
+        y='mean',
+        error_y='std',
+        labels={'mean': 'Average Treatment Effect', 'elasticity_quartile': 'Elasticity Quartile'},
+        title='Effect by Supply Elasticity Quartile',
+        color='mean',
+        color_continuous_scale='RdYlBu_r'
+    )
+    return fig_quartile.to_dict()
+
+@st.fragment
+def render_summary():
     col1, col2 = st.columns(2)
     
     with col1:
@@ -440,46 +587,17 @@ with tab3:
         metrics_col1.metric("95% CI", f"[{summary_stats['ate_lower']:.3f}, {summary_stats['ate_upper']:.3f}]")
         metrics_col2.metric("Observations", f"{summary_stats['n_obs']:,}")
         
-        fig_hist = px.histogram(
-            results_df, x='cate', nbins=30,
-            labels={'cate': 'Treatment Effect'},
-            title='Distribution of Treatment Effects'
-        )
-        fig_hist.add_vline(x=summary_stats['ate'], line_dash="dash", line_color="red",
-                          annotation_text=f"Mean: {summary_stats['ate']:.4f}")
-        st.plotly_chart(fig_hist, use_container_width=True)
+        st.plotly_chart(make_cate_histogram(), use_container_width=True)
     
     with col2:
         st.subheader("Heterogeneity Drivers")
         
-        fig_importance = px.bar(
-            importance_df.sort_values('importance'),
-            x='importance',
-            y='feature',
-            orientation='h',
-            labels={'importance': 'Importance', 'feature': 'Feature'},
-            title='What Drives Treatment Effect Heterogeneity?'
-        )
-        st.plotly_chart(fig_importance, use_container_width=True)
-        
-        results_df['elasticity_quartile'] = pd.qcut(
-            results_df['elasticity'], q=4,
-            labels=['Q1 (Constrained)', 'Q2', 'Q3', 'Q4 (Elastic)']
-        )
+        st.plotly_chart(make_importance_bar(), use_container_width=True)
         
-        quartile_stats = results_df.groupby('elasticity_quartile')['cate'].agg(['mean', 'std']).reset_index()
-        
-        fig_quartile = px.bar(
-            quartile_stats,
-            x='elasticity_quartile',
-            y='mean',
-            error_y='std',
-            labels={'mean': 'Average Treatment Effect', 'elasticity_quartile': 'Elasticity Quartile'},
-            title='Effect by Supply Elasticity Quartile',
-            color='mean',
-            color_continuous_scale='RdYlBu_r'
-        )
-        st.plotly_chart(fig_quartile, use_container_width=True)
+        st.plotly_chart(make_quartile_bar(), use_container_width=True)
+
+with tab3:
+    render_summary()
 
 # Footer
 st.markdown("---")